@@ -1,34 +1,41 @@
-from dataclasses import dataclass
-from math import floor, sqrt
+from functools import lru_cache
+from math import floor, log, sqrt
+import numpy as np
+import scipy.special
 import scipy.stats
-from typing import Callable, Iterable, Generic, List, Tuple, TypeVar
+import sparklines
+from typing import (
+    Callable, Iterable, Generic, List, NamedTuple, Tuple, TypeVar)
 
 Version = str
 TestResult = Tuple[Version, bool, float]  # (version, success/failure, cost)
 History = List[TestResult]
 
 
-@dataclass(frozen=True, eq=True)
-class Change:
+# A NamedTuple rather than a frozen dataclass (slots=True needs python 3.10)
+# so that hashing and comparison are done by the tuple type in C.
+class Change(NamedTuple):
     before: Version
     after: Version
 
     def to_string(self, max_len=10):
+        # Lengths are checked before formatting so that the common case of
+        # short version names formats exactly one string.
         before = self.before
         after = self.after
-        attempt = f"{before}->{after}"
-        if len(attempt) <= max_len: return attempt
+        arrow_len = len("->")
+        if len(before) + arrow_len + len(after) <= max_len:
+            return f"{before}->{after}"
         trunc_len = floor((max_len - 4) / 2)
         if len(before) > len(after):
             before = before[:trunc_len] + "…"
-        attempt = f"{before}->{after}"
-        if len(attempt) <= max_len: return attempt
+            if len(before) + arrow_len + len(after) <= max_len:
+                return f"{before}->{after}"
         after = after[:trunc_len] + "…"
-        attempt = f"{before}->{after}"
-        if len(attempt) <= max_len: return attempt
+        if len(before) + arrow_len + len(after) <= max_len:
+            return f"{before}->{after}"
         before = before[:trunc_len] + "…"
-        attempt = f"{before}->{after}"
-        return attempt
+        return f"{before}->{after}"
 
     def __str__(self):
         return self.to_string()
@@ -37,6 +44,7 @@ class Change:
 class HistorySummary:
     """Holds a variety of useful accumulated statistics about a history:
         versions            Name of each version
+        version_index       Position of each version in `versions`
         success_counts      For each version, number of successes at version
         failure_counts      For each version, number of failures at version
         counts              For each version, number of tests at version
@@ -44,65 +52,177 @@ class HistorySummary:
         failure_count       Total number of failed tests over all versions
         count               Total number of tests over all versions
         changes             Every version-to-version change
+        change_index        Position of each change in `changes`
         left_sum_successes  For each change, # of successes in prior versions
         left_sum_failures   For each change, # of failures in prior versions
         right_sum_successes For each change, # of successes in subsequent vers
         right_sum_failures  For each change, # of failures in subsequent vers
+
+    The per-version and per-change statistics are numpy arrays indexed by
+    version position and change position respectively.
     """
 
+    STR_MAX_ITEMS = 8
+
     def __init__(self, versions: List[Version], history: History):
+        self._init_versions(versions)
+        indices = np.fromiter(
+            (self.version_index[r] for (r, _, _) in history),
+            dtype=np.int32, count=len(history))
+        outcomes = np.fromiter((t for (_, t, _) in history),
+                               dtype=np.bool_, count=len(history))
+        self._accumulate_arrays(indices, outcomes)
+
+    def append(self, result: TestResult):
+        """Add one more test result to this summary in place, in O(V).
+
+        Arrays previously read from this summary (including `p_values`) are
+        not modified; they simply no longer describe it.
+
+        If `hypothetical_guess_probabilities` was computed for this outcome
+        before appending, the new p-values are taken from it rather than
+        recomputed.
+        """
+        version, success, _ = result
+        version_index = self.version_index[version]
+        hypothetical = self._hypothetical_p_values.get(bool(success))
+        self._accumulate(*self._counts_with_result(version_index, success))
+        if hypothetical is not None:
+            ps_if_left, ps_if_right = hypothetical
+            ps = np.where(np.arange(len(self.changes)) >= version_index,
+                          ps_if_left, ps_if_right)
+            ps.setflags(write=False)
+            self._p_values = ps
+
+    def p_values(self) -> np.ndarray:
+        """Compute `p_value` for every change at once, as an array indexed by
+        change position.
+
+        The result is memoized until the next `append` and so must not be
+        mutated by callers.
+        """
+        if self._p_values is None:
+            if self.count == 0:
+                ps = np.ones(len(self.changes))
+            else:
+                ps = split_p_values(
+                    self.left_sum_successes, self.left_sum_counts,
+                    self.right_sum_successes, self.right_sum_counts,
+                    self.success_count / self.count)
+            ps.setflags(write=False)
+            self._p_values = ps
+        return self._p_values
+
+    def hypothetical_guess_probabilities(self, success: bool) -> np.ndarray:
+        """For each version, compute the `Guess.guess_probability` that would
+        result from adding one more test result of @p success at that
+        version.
+
+        Adding a result at version v adds it to the left side of every change
+        after v and to the right side of every change before v, so every
+        hypothetical is assembled from just two evaluations of
+        `split_p_values` rather than one full evaluation per version.  Those
+        p-values are kept until the next `append`, which reuses them if it
+        adds a result of the same outcome.
+        """
+        success = int(success)
+        hypothesis_p = (self.success_count + success) / (self.count + 1)
+        lss, lsc = self.left_sum_successes, self.left_sum_counts
+        rss, rsc = self.right_sum_successes, self.right_sum_counts
+        ps_if_left = split_p_values(lss + success, lsc + 1, rss, rsc,
+                                    hypothesis_p)
+        ps_if_right = split_p_values(lss, lsc, rss + success, rsc + 1,
+                                     hypothesis_p)
+        self._hypothetical_p_values[bool(success)] = (
+            ps_if_left, ps_if_right)
+        # The weights for a result at version v are those of `ps_if_right`
+        # for the changes before v followed by those of `ps_if_left` from v
+        # on, so their maximum and sum come from running maxima and sums
+        # over the two arrays, in O(V) rather than from a V-by-(V-1) matrix.
+        # Weights are positive, so 0 stands in for an empty side.
+        weights_if_left = 1 / ps_if_left
+        weights_if_right = 1 / ps_if_right
+        none = np.zeros(1)
+        max_before = np.concatenate(
+            [none, np.maximum.accumulate(weights_if_right)])
+        sum_before = np.concatenate([none, np.cumsum(weights_if_right)])
+        max_from = np.concatenate(
+            [np.maximum.accumulate(weights_if_left[::-1])[::-1], none])
+        sum_from = np.concatenate(
+            [np.cumsum(weights_if_left[::-1])[::-1], none])
+        return np.maximum(max_before, max_from) / (sum_before + sum_from)
+
+    def _init_versions(self, versions: List[Version]):
+        """Set up the per-version and per-change bookkeeping."""
         assert len(versions) > 1
         self.versions = versions
-        self.success_counts = [sum(t for (r, t, _) in history if r is rev)
-                               for rev in versions]
-        self.failure_counts = [sum((not t)
-                                   for (r, t, _) in history if r is rev)
-                               for rev in versions]
-        self.counts = [len([r for (r, _, _) in history if r is rev])
-                       for rev in versions]
-
-        self.success_count = sum(self.success_counts)
-        self.failure_count = sum(self.failure_counts)
-        self.count = sum(self.counts)
-
+        self.version_index = {v: i for i, v in enumerate(versions)}
         self.changes = [Change(versions[i], versions[i+1])
                         for i in range(len(versions) - 1)]
-        self.left_sum_successes = {}
-        accumulator = 0
-        for i, c in enumerate(self.changes):
-            accumulator += self.success_counts[i]
-            self.left_sum_successes[c] = accumulator
-
-        self.left_sum_failures = {}
-        accumulator = 0
-        for i, c in enumerate(self.changes):
-            accumulator += self.failure_counts[i]
-            self.left_sum_failures[c] = accumulator
-
-        self.left_sum_counts = {
-            c: self.left_sum_failures[c] + self.left_sum_successes[c]
-            for c in self.changes}
-
-        self.right_sum_successes = {
-            c: self.success_count - self.left_sum_successes[c]
-            for c in self.changes}
-        self.right_sum_failures = {
-            c: self.failure_count - self.left_sum_failures[c]
-            for c in self.changes}
-        self.right_sum_counts = {
-            c: self.count - self.left_sum_counts[c]
-            for c in self.changes}
+        self.change_index = {c: i for i, c in enumerate(self.changes)}
+
+    def _counts_with_result(self, version_index: int, success: bool
+                            ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return new success and failure count arrays with one more result
+        at `versions[version_index]`."""
+        success_counts = self.success_counts.copy()
+        failure_counts = self.failure_counts.copy()
+        if success:
+            success_counts[version_index] += 1
+        else:
+            failure_counts[version_index] += 1
+        return success_counts, failure_counts
+
+    def _accumulate_arrays(self, indices: np.ndarray, outcomes: np.ndarray):
+        """Compute every statistic from parallel version-index and outcome
+        arrays."""
+        success_counts = np.bincount(indices[outcomes],
+                                     minlength=len(self.versions))
+        counts = np.bincount(indices, minlength=len(self.versions))
+        self._accumulate(success_counts, counts - success_counts)
+
+    def _accumulate(self, success_counts: np.ndarray,
+                    failure_counts: np.ndarray):
+        """Compute every derived statistic from the per-version counts."""
+        self.success_counts = success_counts
+        self.failure_counts = failure_counts
+        self.counts = success_counts + failure_counts
+
+        self.success_count = int(self.success_counts.sum())
+        self.failure_count = int(self.failure_counts.sum())
+        self.count = int(self.counts.sum())
+
+        self.left_sum_successes = np.cumsum(self.success_counts[:-1])
+        self.left_sum_failures = np.cumsum(self.failure_counts[:-1])
+        self.left_sum_counts = self.left_sum_successes + self.left_sum_failures
+        self.right_sum_successes = (
+            self.success_count - self.left_sum_successes)
+        self.right_sum_failures = self.failure_count - self.left_sum_failures
+        self.right_sum_counts = self.count - self.left_sum_counts
+        self._p_values = None  # Memoized by `p_values`.
+        # Memoized by `hypothetical_guess_probabilities`, keyed on outcome.
+        self._hypothetical_p_values = {}
 
     def __str__(self):
+        """A debugging view of every field.  Sequences and dicts longer
+        than `STR_MAX_ITEMS` show only their ends, so that the string stays
+        short for long histories."""
+        half = self.STR_MAX_ITEMS // 2
         s = "{\n"
         for (k, v) in self.__dict__.items():
+            if (isinstance(v, (list, tuple, dict, np.ndarray))
+                    and len(v) > self.STR_MAX_ITEMS):
+                items = list(v.items()) if isinstance(v, dict) else v
+                head, tail = items[:half], items[-half:]
+                if isinstance(v, dict):
+                    head, tail = dict(head), dict(tail)
+                v = f"{head}...{tail} (len={len(v)})"
             s += str(k) + ": " + str(v) + "\n"
         s += "}"
         return s
 
     def fancy_summary(self):
         """Returns a fancy sparkline unicode-art view of the history."""
-        import sparklines
         def spark(vals):
             return "".join(sparklines.sparklines(
                 vals, minimum=0, maximum=(None if any(vals) else 1)))
@@ -122,7 +242,8 @@ class HistorySummary:
         first_graph_indent_num = LONGEST_FIRST_TITLE
         version_graph_width = len(self.versions)
         change_graph_width = len(self.changes)
-        change_graph_hangover = max(len(str(c)) for c in self.changes)
+        change_names = [str(c) for c in self.changes]
+        change_graph_hangover = max(len(name) for name in change_names)
         second_graph_indent_num = (
             first_graph_indent_num
             + change_graph_width
@@ -131,33 +252,31 @@ class HistorySummary:
         def right_just_title(title, width):
             return ' ' * (width - len(title)) + title
 
-        result = ""
+        parts = []
         first_indent = ' ' * first_graph_indent_num
         for i, rev in enumerate(self.versions):
             new_line = ""
             new_line += f"{first_indent}{'|' * i}{str(rev)}"
-            result += new_line + "\n"
-        successes_sparkline = spark(self.success_counts)
-        failures_sparkline = spark(self.failure_counts)
-        result += right_just_title("Successes: ", first_graph_indent_num) 
-        result += spark(self.success_counts) + "\n"
-        result += right_just_title("Failures: ", first_graph_indent_num) 
-        result += spark(self.failure_counts) + "\n"
-
-        result += "\n"
-        for i, change in enumerate(self.changes):
+            parts.append(new_line + "\n")
+        parts.append(right_just_title("Successes: ", first_graph_indent_num))
+        parts.append(spark(self.success_counts) + "\n")
+        parts.append(right_just_title("Failures: ", first_graph_indent_num))
+        parts.append(spark(self.failure_counts) + "\n")
+
+        parts.append("\n")
+        for i, change_name in enumerate(change_names):
             new_line = ""
-            new_line += f"{first_indent}{'|' * i}{str(change)}"
+            new_line += f"{first_indent}{'|' * i}{change_name}"
             additional_indent = (
                 ' ' * (second_graph_indent_num - len(new_line)))
-            new_line += f"{additional_indent}{'|' * i}{str(change)}"
-            result += new_line + "\n"
-        lss = [self.left_sum_successes[c] for c in self.changes]
-        rss = [self.right_sum_successes[c] for c in self.changes]
-        lsf = [self.left_sum_failures[c] for c in self.changes]
-        rsf = [self.right_sum_failures[c] for c in self.changes]
-        lsc = [sum(pair) for pair in zip(lss, lsf)]
-        rsc = [sum(pair) for pair in zip(rss, rsf)]
+            new_line += f"{additional_indent}{'|' * i}{change_name}"
+            parts.append(new_line + "\n")
+        lss = self.left_sum_successes
+        rss = self.right_sum_successes
+        lsf = self.left_sum_failures
+        rsf = self.right_sum_failures
+        lsc = self.left_sum_counts
+        rsc = self.right_sum_counts
         def two_graph_line(first_title, first_data,
                            second_title, second_data):
             new_line = right_just_title(first_title, first_graph_indent_num)
@@ -166,28 +285,25 @@ class HistorySummary:
                 second_title, second_graph_indent_num - len(new_line))
             new_line += spark(second_data) + "\n" 
             return new_line
-        result += two_graph_line("Successes (before) ", lss, "(after) ", rss)
-        result += two_graph_line("Failures (before) ", lsf, "(after) ", rsf)
-
-        lratio = []
-        rratio = []
-        for i, _ in enumerate(self.changes):
-            if lsc[i] == 0:
-                lratio.append(None)
-            else:
-                lratio.append(lss[i] / lsc[i])
-            if rsc[i] == 0:
-                rratio.append(None)
-            else:
-                rratio.append(rss[i] / rsc[i])
-        result += two_graph_line("Succ. rate (before) ", lratio,
-                                 "(after) ", rratio)
-
-        ps = [p_value(self, c) for c in self.changes]
+        parts.append(
+            two_graph_line("Successes (before) ", lss, "(after) ", rss))
+        parts.append(
+            two_graph_line("Failures (before) ", lsf, "(after) ", rsf))
+
+        lratio = [s / n if n else None
+                  for s, n in zip(lss.tolist(), lsc.tolist())]
+        rratio = [s / n if n else None
+                  for s, n in zip(rss.tolist(), rsc.tolist())]
+        parts.append(two_graph_line("Succ. rate (before) ", lratio,
+                                    "(after) ", rratio))
+
+        # `p_values` is memoized, so this reuses whatever the caller's Guess
+        # already computed.
+        ps = self.p_values().tolist()
         probs = [1/p if p > 0 else None for p in ps]  # unweighted :-(
-        result += "\n"
-        result += two_graph_line("p-value: ", ps, "probs: ", probs)
-        return result
+        parts.append("\n")
+        parts.append(two_graph_line("p-value: ", ps, "probs: ", probs))
+        return "".join(parts)
 
 
 def p_value(history_parameters: HistorySummary,
@@ -201,30 +317,175 @@ def p_value(history_parameters: HistorySummary,
 
     @Returns 1 if the history is inadequate to estimate.
     """
-    if history_parameters.count == 0:
-        return 1.
-    hypothesis_p = history_parameters.success_count / history_parameters.count
-    left_n = history_parameters.left_sum_counts[change]
-    left_successes = history_parameters.left_sum_successes[change]
-    right_n = history_parameters.right_sum_counts[change]
-    right_successes = history_parameters.right_sum_successes[change]
-    if left_n < 1 or right_n < 1:
-        return 1.
-
-    p_left = scipy.stats.binomtest(
-        left_successes, left_n, hypothesis_p,
-        alternative='two-sided').pvalue
-    p_right = scipy.stats.binomtest(
-        right_successes, right_n, hypothesis_p,
-        alternative='two-sided').pvalue
-    if p_left == 0 or p_right == 0:
-        return 0.
+    i = history_parameters.change_index[change]
+    return float(history_parameters.p_values()[i])
+
+
+def split_p_values(left_successes: np.ndarray, left_n: np.ndarray,
+                   right_successes: np.ndarray, right_n: np.ndarray,
+                   hypothesis_p: float) -> np.ndarray:
+    """Compute change p-values from the success and test counts on either
+    side of each change, given the overall success rate @p hypothesis_p.
+
+    Changes with no tests on one side are inadequately tested and get a
+    p-value of 1 without running the binomial tests at all.
+    """
+    ps = np.ones(np.shape(left_n))
+    testable = (left_n >= 1) & (right_n >= 1)
+    if not testable.any() or not 0 < hypothesis_p < 1:
+        return ps
+    p_left = binomial_test_p_values(
+        left_successes[testable], left_n[testable], hypothesis_p)
+    p_right = binomial_test_p_values(
+        right_successes[testable], right_n[testable], hypothesis_p)
 
     # Fisher's method assumes the p-values are independent, which is not true
     # here (the common expectation value `hypothesis_p` is in common between
     # the two arms).  As such this value is (slightly) unsound for small n.
-    _stat, pval = scipy.stats.combine_pvalues(pvalues=[p_left, p_right])
-    return pval
+    ps[testable] = fisher_combined_p_value(p_left, p_right)
+    return ps
+
+
+# Relative tolerance used by `scipy.stats.binomtest` when deciding whether an
+# outcome is at most as likely as the observed one.
+_BINOMIAL_TEST_RERR = 1 + 1e-7
+
+
+# Above this many outcome-by-test probabilities, `binomial_test_p_values`
+# locates each test's far tail by binary search rather than tabulating every
+# outcome's probability.  The two methods measure about even near 4e4.
+_BINOMIAL_TEST_MAX_TABLE_SIZE = 1 << 15
+
+
+def binomial_test_p_values(successes: np.ndarray,
+                           trials: np.ndarray,
+                           p: float) -> np.ndarray:
+    """Vectorized two-sided exact binomial test.
+
+    Elementwise equivalent to
+    `scipy.stats.binomtest(successes, trials, p).pvalue`: the sum of the
+    probabilities of every outcome no more likely than the observed one.
+    Small tests are computed together from one table of log-factorials;
+    large ones in O(log n) per test as scipy itself does.
+    """
+    successes = np.asarray(successes)
+    trials = np.asarray(trials)
+    if not 0 < p < 1:
+        # Every outcome not equal to p * trials is impossible.
+        return np.where(successes == p * trials, 1., 0.)
+    max_n = int(trials.max(initial=0))
+    if successes.size * (max_n + 1) > _BINOMIAL_TEST_MAX_TABLE_SIZE:
+        pval = _binomial_test_by_search(successes, trials, p)
+    else:
+        pval = _binomial_test_by_table(successes, trials, p, max_n)
+    return np.where(successes == p * trials, 1., np.minimum(1., pval))
+
+
+def _binomial_test_by_table(successes: np.ndarray, trials: np.ndarray,
+                            p: float, max_n: int) -> np.ndarray:
+    """`binomial_test_p_values` by summing a table of the probabilities of
+    every outcome of every test; O(n) time and memory per test."""
+    outcomes = np.arange(max_n + 1)
+    padded_log_factorial = _padded_log_factorials(max_n)
+    log_factorial = padded_log_factorial[:max_n + 1]
+    log_p, log_q = log(p), np.log1p(-p)
+
+    # log pmf(i; n) splits into a term depending only on n, a term depending
+    # only on i, and -log((n - i)!).  Only the last needs a full outcomes-by-
+    # trials gather.  The +inf padding sends the negative indices n - i < 0
+    # (outcomes i > n) to log(0!) = -inf, i.e. to probability 0.
+    trials_terms = log_factorial[trials] + trials * log_q
+    outcome_terms = outcomes * (log_p - log_q) - log_factorial
+    all_pmfs = trials_terms[..., np.newaxis] + outcome_terms
+    all_pmfs -= padded_log_factorial[trials[..., np.newaxis] - outcomes]
+    np.exp(all_pmfs, out=all_pmfs)
+    observed_pmf = np.exp(trials_terms + outcome_terms[successes]
+                          - log_factorial[trials - successes])
+    # Zeroing the more likely outcomes in place and summing is several times
+    # faster than a masked `np.sum(..., where=...)`.
+    all_pmfs *= all_pmfs <= (observed_pmf * _BINOMIAL_TEST_RERR)[
+        ..., np.newaxis]
+    return all_pmfs.sum(axis=-1)
+
+
+def _binomial_test_by_search(successes: np.ndarray, trials: np.ndarray,
+                             p: float) -> np.ndarray:
+    """`binomial_test_p_values` by the method of `scipy.stats.binomtest`:
+    binary search the far side of the mode for where the probabilities drop
+    to the observed one, then add up the two tails.  O(log n) time and O(1)
+    memory per test, with all tests searched in lockstep."""
+    k = successes.astype(np.int64)
+    n = trials.astype(np.int64)
+    threshold = _binomial_pmf(k, n, p) * _BINOMIAL_TEST_RERR
+    below_mode = k < p * n
+    # The search is over outcomes on the far side of the mode from k, where
+    # `sign * pmf` is increasing.
+    sign = np.where(below_mode, -1., 1.)
+    target = sign * threshold
+    lo = np.where(below_mode, np.ceil(p * n), 0).astype(np.int64)
+    hi = np.where(below_mode, n, np.floor(p * n)).astype(np.int64)
+    found = np.zeros(k.shape, dtype=np.bool_)
+    searching = lo < hi
+    while searching.any():
+        mid = lo + (hi - lo) // 2
+        mid_value = sign * _binomial_pmf(mid, n, p)
+        less = searching & (mid_value < target)
+        greater = searching & (mid_value > target)
+        equal = searching & ~less & ~greater
+        lo = np.where(less, mid + 1, np.where(equal, mid, lo))
+        hi = np.where(greater, mid - 1, np.where(equal, mid, hi))
+        found |= equal
+        searching = (lo < hi) & ~found
+    edge = np.where(
+        found | (sign * _binomial_pmf(lo, n, p) <= target), lo, lo - 1)
+
+    # Below the mode the far tail is the outcomes after `edge` (and `edge`
+    # itself in the rare case that it exactly meets the threshold); above
+    # it, the outcomes up to and including `edge`.
+    far_tail_start = edge + 1 - (threshold == _binomial_pmf(edge, n, p))
+    binom = scipy.stats.binom
+    return np.where(below_mode,
+                    binom.cdf(k, n, p) + binom.sf(far_tail_start - 1, n, p),
+                    binom.cdf(edge, n, p) + binom.sf(k - 1, n, p))
+
+
+def _binomial_pmf(k: np.ndarray, n: np.ndarray, p: float) -> np.ndarray:
+    gammaln = scipy.special.gammaln
+    return np.exp(gammaln(n + 1) - gammaln(k + 1) - gammaln(n - k + 1)
+                  + k * log(p) + (n - k) * np.log1p(-p))
+
+
+def _padded_log_factorials(max_n: int) -> np.ndarray:
+    """Return a read-only table of log(i!) for i up to at least @p max_n,
+    followed by at least max_n + 1 entries of +inf, so that any index in
+    [-(max_n + 1), -1] reads +inf.
+
+    Tables are cached by power-of-two size, so a growing history only
+    recomputes the table when it doubles.
+    """
+    return _padded_log_factorial_table(1 << max_n.bit_length())
+
+
+@lru_cache(maxsize=None)
+def _padded_log_factorial_table(size: int) -> np.ndarray:
+    table = np.concatenate([scipy.special.gammaln(np.arange(size) + 1),
+                            np.full(size, np.inf)])
+    table.setflags(write=False)
+    return table
+
+
+def fisher_combined_p_value(p_left: float, p_right: float) -> float:
+    """Combine two p-values with Fisher's method.
+
+    The statistic -2 ln(p_left * p_right) has a chi-squared distribution with
+    four degrees of freedom, whose survival function has the closed form
+    x (1 - ln x) for x = p_left * p_right.  This gives the same result as
+    `scipy.stats.combine_pvalues` without its per-call overhead.  Accepts
+    arrays as well as scalars.  Written as x - xlogy(x, x), the expression
+    takes its limit of 0 at x = 0 rather than producing nan.
+    """
+    x = p_left * p_right
+    return x - scipy.special.xlogy(x, x)
 
 
 def history_probabilities(
@@ -236,20 +497,39 @@ def history_probabilities(
     success probability.  The last version has no well-defined probability
     and is omitted.
     """
-    params = HistorySummary(versions, history)
+    return summary_probabilities(HistorySummary(versions, history))
+
+
+def summary_probabilities(
+        params: HistorySummary
+    ) -> List[Tuple[Change, float]]:
+    """As `history_probabilities`, but from an already-built summary."""
     changes = params.changes
-    ps = [p_value(params, c) for c in changes]
+    if params.count == 0 and changes:
+        # With no evidence every change is equally likely.
+        uniform_probability = 1 / len(changes)
+        return [(change, uniform_probability) for change in changes]
+    ps = params.p_values()
 
     # The above ps are "p-values" -- P(A==B|r).  For reasons described in
     # other documents, an application of Bayes' theorem tells us that
     # P(r|A!=B) is simply the normalization of the complement of these
     # probabilities.
-    weights = [1 / p for p in ps]
-    total_weight = sum(weights)
-    version_probabilities = [weight / total_weight for weight in weights]
+    weights = 1 / ps
+    version_probabilities = (weights / weights.sum()).tolist()
+    return list(zip(changes, version_probabilities))
+
 
-    return [(changes[i], version_probabilities[i])
-            for i in range(len(changes))]
+def summary_best_change(params: HistorySummary) -> Tuple[int, float]:
+    """Return the position in `params.changes` of the most likely change and
+    its probability, as the first maximum of `summary_probabilities` but
+    without building the full list."""
+    if params.count == 0 and params.changes:
+        # With no evidence every change is equally likely.
+        return 0, 1 / len(params.changes)
+    weights = 1 / params.p_values()
+    best = int(weights.argmax())
+    return best, float(weights[best] / weights.sum())
 
 
 class Guess:
@@ -258,10 +538,22 @@ class Guess:
     """
     def __init__(self, versions: List[Version], history: History):
         self.history = history
-        probabilities = history_probabilities(versions, history)
+        self._choose_best(HistorySummary(versions, history))
+
+    @classmethod
+    def from_summary(cls, summary: HistorySummary,
+                     history: History = None) -> "Guess":
+        """Make a guess from an already-built summary of @p history."""
+        guess = cls.__new__(cls)
+        guess.history = history
+        guess._choose_best(summary)
+        return guess
+
+    def _choose_best(self, summary: HistorySummary):
+        self._summary = summary
         (self._best_version_index,
-         (self._best_change, self._guess_probability)) = max(
-             enumerate(probabilities), key=lambda x: x[1][1])
+         self._guess_probability) = summary_best_change(summary)
+        self._best_change = summary.changes[self._best_version_index]
 
     @property
     def best_change(self):
@@ -270,3 +562,8 @@ class Guess:
     @property
     def guess_probability(self):
         return self._guess_probability
+
+    @property
+    def summary(self):
+        """The `HistorySummary` on which this guess is based."""
+        return self._summary
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Callable, Generic, List, TypeVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Generic, Optional, Sequence, TypeVar
 
 VersionType = TypeVar('VersionType')
 
@@ -12,7 +12,7 @@ class SearchProblem(Generic[VersionType]):
 
     @p setup_fn, if provided, will be called before @p test_fn is called
     on a new version.  This would be the place to, eg, build a new version
-    of the code.
+    of the code.  Without one, switching versions is taken to be free.
 
     If @p current_version is set, @p setup_fn will not be called before
     an initial call to `test_fn(current_version)`.
@@ -23,30 +23,53 @@ class SearchProblem(Generic[VersionType]):
     suspicious range.  If either of these is not specified, it will be
     inferred during computation.
 
+    The search stops as soon as its best guess of the guilty change has
+    probability @p target_probability.
+
+    If @p deterministic is set, @p test_fn is taken to always give the same
+    result for a given version, so it is called at most once per version;
+    later tests of a version reuse that result without setting it up again,
+    at no cost.  Each reused result still counts as fresh evidence toward
+    @p target_probability, so the reported confidence is inflated relative
+    to the number of distinct versions actually tested.
+
     @p known_setup_cost and @p known_test_cost allow you to specify a cost
     to be used in choosing whether to run an additional test or to
     switch to a new version.  If either of these is not specified, it will
-    be set to the average empirical runtime of the @p setup_fn or
-    @p test_fn respectively, in seconds.
+    be estimated from a moving average of the empirical runtime of the
+    @p setup_fn or @p test_fn respectively, in seconds.
     """
 
-    versions: List[VersionType]
+    versions: Sequence[VersionType]
     test_fn: Callable[[VersionType], bool]
-    setup_fn: Callable[[VersionType], None]=(lambda _: None)
+    setup_fn: Optional[Callable[[VersionType], None]]=None
     current_version: VersionType=None
     known_initial_success_probability: float=None
     known_final_success_probability: float=None
     known_setup_cost: float=None
     known_test_cost: float=None
+    target_probability: float=0.9
+    deterministic: bool=False
+    _version_index: Dict[VersionType, int]=field(
+        init=False, repr=False, compare=False)
 
     def __post_init__(self):
+        # Stored as a tuple so that the index below cannot go stale.
+        self.versions = tuple(self.versions)
+        self._version_index = {v: i for i, v in enumerate(self.versions)}
         assert self.test_fn is not None
         assert len(self.versions) > 2
         assert (self.current_version is None) or (
-            self.current_version in self.versions)
+            self.current_version in self._version_index)
         assert (self.known_initial_success_probability is None) or (
             0 <= self.known_initial_success_probability <= 1)
         assert (self.known_final_success_probability is None) or (
             0 <= self.known_final_success_probability <= 1)
         assert (self.known_setup_cost is None) or (self.known_setup_cost >= 0)
         assert (self.known_test_cost is None) or (self.known_test_cost > 0)
+        assert 0 < self.target_probability < 1
+
+    def index_of(self, version: VersionType) -> int:
+        """Return the position of @p version in `versions`, without a
+        linear scan."""
+        return self._version_index[version]
@@ -12,6 +12,9 @@ class StrategyRunner:
     """Actually runs a strategy on a search problem.  Its ctor acts as the
     factory for strategy objects."""
 
+    # Weight given to the newest measurement when updating a cost estimate.
+    COST_SMOOTHING = 0.2
+
     def __init__(self):
         """Create a strategy runner.  Does not now but eventually will take
         factory arguments to instantiate the strategy."""
@@ -19,49 +22,70 @@ class StrategyRunner:
 
     def solve(self, problem: SearchProblem, print_monitor=False):
         history = []
-        guess = Guess(problem.versions, history)
-        target_probability = 0.9  # TODO parameterize this (in the problem?)
+        # One summary is kept up to date as results arrive, rather than
+        # rebuilt from the whole history every iteration.
+        summary = HistorySummary(problem.versions, history)
+        guess = Guess.from_summary(summary, history)
         setup_cost = problem.known_setup_cost
+        if problem.setup_fn is None and setup_cost is None:
+            setup_cost = 0  # There is nothing to set up, or to time.
         test_cost = problem.known_test_cost
         assert (guess.guess_probability <= (1 / (len(problem.versions) - 1)))
+        # Results of a deterministic problem's tests, by version.  Reused
+        # results are not timed, so they don't skew the cost estimates.
+        known_results = {}
         iterations = 0
-        while guess.guess_probability < target_probability:
+        while guess.guess_probability < problem.target_probability:
             iterations += 1
             next_version = self._strategy.next_version(
-                history, problem, setup_cost, test_cost)
-            if problem.current_version != next_version:
-                _, setup_cost = self.updated_cost(
-                    problem.known_setup_cost, setup_cost, history,
-                    lambda: problem.setup_fn(next_version))
-            problem.current_version = next_version
-            result, test_cost = self.updated_cost(
-                problem.known_test_cost, test_cost, history,
-                lambda: problem.test_fn(next_version))
-            history += [(next_version, result, test_cost)]
-            guess = Guess(problem.versions, history)
+                history, problem, setup_cost, test_cost, summary=summary)
+            if next_version in known_results:
+                # Neither set up nor run, so recorded as free.
+                result, cost = known_results[next_version], 0
+            else:
+                if (problem.current_version != next_version
+                        and problem.setup_fn is not None):
+                    _, setup_cost = self.updated_cost(
+                        problem.known_setup_cost, setup_cost,
+                        lambda: problem.setup_fn(next_version))
+                problem.current_version = next_version
+                result, test_cost = self.updated_cost(
+                    problem.known_test_cost, test_cost,
+                    lambda: problem.test_fn(next_version))
+                cost = test_cost
+                if problem.deterministic:
+                    known_results[next_version] = result
+            history += [(next_version, result, cost)]
+            summary.append(history[-1])
+            guess = Guess.from_summary(summary, history)
             if print_monitor:
-                print(HistorySummary(problem.versions, history)
-                        .fancy_summary())
+                print(guess.summary.fancy_summary())
                 print(f"Best guess is change {guess.best_change} "
                       f"with probability {guess.guess_probability:.2f} "
                       f"after {iterations} iterations.")
                 print()
         return guess
 
-    @staticmethod
-    def updated_cost(known_prior, estimated_prior, history, fn):
+    @classmethod
+    def updated_cost(cls, known_prior, estimated_prior, fn):
         """Evaluate fn(); return its result and the best estimate of its
-        cost."""
+        cost.
+
+        Unless @p known_prior is given, the estimate is an exponentially
+        weighted moving average of the measured durations, so that it follows
+        drift (eg from warming caches) rather than averaging over the whole
+        run."""
         # TODO There really are lots of kinds of cost and time is only one.
+        if known_prior is not None:
+            return fn(), known_prior
         start = time.perf_counter()
         result = fn()
         duration = time.perf_counter() - start
-        if known_prior:
-            return result, known_prior
         if estimated_prior is None:
             return result, duration
         return (result,
-            (estimated_prior * len(history) + duration) / (len(history) + 1))
+                cls.COST_SMOOTHING * duration
+                + (1 - cls.COST_SMOOTHING) * estimated_prior)
 
 
 class DefaultSearchStrategy:
@@ -71,17 +95,24 @@ class DefaultSearchStrategy:
     (setup_cost / test_cost many times) without regard for probabilities.
     Pretty much just meant to establish a baseline for testing."""
 
-    def next_version(self, history, problem, setup_cost, test_cost):
+    def next_version(self, history, problem, setup_cost, test_cost,
+                     summary=None):
+        """Choose the next version to test.  @p summary, if given, must be a
+        `HistorySummary` of @p history over `problem.versions`."""
         if not history:
             return problem.current_version or problem.versions[0]
         cost_ratio = (1 if setup_cost is None or test_cost is None
                       else math.ceil(setup_cost / test_cost))
-        revision_counts = [sum(1 for h in history if h[0] == r)
-                           for r in problem.versions]
-        min_val, min_idx = min((val, idx)
-                               for (idx, val) in enumerate(revision_counts))
-        max_val = max(revision_counts)
-        if problem.current_version is None or max_val - min_val > cost_ratio:
+        if summary is None:
+            summary = HistorySummary(problem.versions, history)
+        revision_counts = summary.counts
+        min_idx = int(revision_counts.argmin())
+        min_val = int(revision_counts[min_idx])
+        max_val = int(revision_counts.max())
+        # A deterministic problem's tested versions have known results, so
+        # moving to one costs nothing.
+        if (problem.current_version is None or max_val - min_val > cost_ratio
+                or (problem.deterministic and min_val > 0)):
             return problem.versions[min_idx]
         else:
             return problem.current_version
@@ -103,36 +134,41 @@ class BestChangeSearchStrategy:
         ratio of setup cost to test cost is used."""
         self._inertia = inertia_factor
 
-    def next_version(self, history, problem, setup_cost, test_cost):
+    def next_version(self, history, problem, setup_cost, test_cost,
+                     summary=None):
+        """Choose the next version to test.  @p summary, if given, must be a
+        `HistorySummary` of @p history over `problem.versions`."""
         if not history:
             return (problem.current_version or
                     problem.versions[int(len(problem.versions) / 2)])
         versions = problem.versions
-        current_version_index = (None if not problem.current_version
-                                 else versions.index(problem.current_version))
-        summary = HistorySummary(versions, history)
+        if summary is None:
+            summary = HistorySummary(versions, history)
+        current_version_index = (
+            None if not problem.current_version
+            else summary.version_index[problem.current_version])
         # Heuristic:  Add one to both success and failure totals to give sane
         # results at low sample sizes.
         success_fraction = (summary.success_count + 1) / (summary.count + 2)
         failure_fraction = 1. - success_fraction
-        baseline = Guess(versions, history).guess_probability
-
-        def prob_after_try(version):
-            alt_histories = [history + [(version, result, 0)]
-                             for result in [True, False]]
-            prob_after_success, prob_after_failure = [
-                Guess(versions, alt_history).guess_probability
-                for alt_history in alt_histories]
-            return (prob_after_success * success_fraction +
-                    prob_after_failure * failure_fraction)
-
-        rewards = [(baseline - prob_after_try(version)) ** 2
-                   for version in versions]
-        if problem.current_version:
+        baseline = Guess.from_summary(summary).guess_probability
+
+        prob_after_try = (
+            summary.hypothetical_guess_probabilities(True) * success_fraction
+            + summary.hypothetical_guess_probabilities(False)
+            * failure_fraction)
+        rewards = ((baseline - prob_after_try) ** 2).tolist()
+        # Until a setup has been timed there is no switching cost to weigh.
+        if problem.current_version and setup_cost is not None:
             status_quo_preference = ((1 + self._inertia)
                                      * (setup_cost + test_cost)
                                      / test_cost)
-            print(f"Status quo preference: {status_quo_preference}")
             rewards[current_version_index] *= status_quo_preference
+            if problem.deterministic:
+                # Results already known are reused without a setup, so
+                # those versions are as cheap to pick as the current one.
+                for index, count in enumerate(summary.counts.tolist()):
+                    if count and index != current_version_index:
+                        rewards[index] *= status_quo_preference
         best_version_index = max(enumerate(rewards), key=lambda x: x[1])[0]
         return versions[best_version_index]
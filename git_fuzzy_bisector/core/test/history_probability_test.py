@@ -1,10 +1,23 @@
 from git_fuzzy_bisector.core.history_analysis import (
-    Change, Guess, HistorySummary, history_probabilities, p_value)
+    Change, Guess, HistorySummary, binomial_test_p_values,
+    fisher_combined_p_value, history_probabilities, p_value,
+    summary_best_change, summary_probabilities)
 
+import numpy as np
 import random
+import scipy.stats
 import unittest
 
 
+class TestChange(unittest.TestCase):
+    def test_to_string(self):
+        """Test that change names are truncated to fit."""
+        self.assertEqual(str(Change("abc", "defg")), "abc->defg")
+        self.assertEqual(str(Change("abcdefghijklm", "no")), "abc…->no")
+        self.assertEqual(str(Change("abcdefghijkl", "mnopqrstuvwx")),
+                         "abc…->mno…")
+
+
 class TestParameterComputation(unittest.TestCase):
     def test_params(self):
         """Test computation of population parameters from history."""
@@ -14,21 +27,64 @@ class TestParameterComputation(unittest.TestCase):
                    ('c', True, 1), ('c', True, 1), ]
         params = HistorySummary(versions, history)
         self.assertEqual(params.versions, ["a", "b", "c"])
-        self.assertEqual(params.success_counts, [0, 1, 2])
-        self.assertEqual(params.failure_counts, [2, 1, 0])
-        self.assertEqual(params.counts, [2, 2, 2])
+        self.assertEqual(params.success_counts.tolist(), [0, 1, 2])
+        self.assertEqual(params.failure_counts.tolist(), [2, 1, 0])
+        self.assertEqual(params.counts.tolist(), [2, 2, 2])
         self.assertEqual(params.success_count, 3)
         self.assertEqual(params.failure_count, 3)
         self.assertEqual(params.count, 6)
         ab = Change("a", "b")
         bc = Change("b", "c")
         self.assertEqual(params.changes, [ab, bc])
-        self.assertEqual(params.left_sum_successes,  {ab: 0, bc: 1})
-        self.assertEqual(params.left_sum_failures,   {ab: 2, bc: 3})
-        self.assertEqual(params.left_sum_counts,     {ab: 2, bc: 4})
-        self.assertEqual(params.right_sum_successes, {ab: 3, bc: 2})
-        self.assertEqual(params.right_sum_failures,  {ab: 1, bc: 0})
-        self.assertEqual(params.right_sum_counts,    {ab: 4, bc: 2})
+        self.assertEqual(params.change_index, {ab: 0, bc: 1})
+        self.assertEqual(params.left_sum_successes.tolist(),  [0, 1])
+        self.assertEqual(params.left_sum_failures.tolist(),   [2, 3])
+        self.assertEqual(params.left_sum_counts.tolist(),     [2, 4])
+        self.assertEqual(params.right_sum_successes.tolist(), [3, 2])
+        self.assertEqual(params.right_sum_failures.tolist(),  [1, 0])
+        self.assertEqual(params.right_sum_counts.tolist(),    [4, 2])
+
+    def test_str(self):
+        """Test that long fields are abbreviated in the string form."""
+        versions = ['version_%d' % i for i in range(100)]
+        text = str(HistorySummary(versions, [('version_3', True, 1)]))
+        self.assertIn("versions: ['version_0', 'version_1', 'version_2', "
+                      "'version_3']...['version_96', 'version_97', "
+                      "'version_98', 'version_99'] (len=100)\n", text)
+        self.assertIn("counts: [0 0 0 1]...[0 0 0 0] (len=100)\n", text)
+        self.assertNotIn('version_50', text)
+        self.assertIn("count: 1\n", text)
+
+    def test_params_uninterned_versions(self):
+        """Test that versions are matched by value, not identity."""
+        versions = ['version_' + c for c in 'abc']
+        history = [(''.join(['version_', 'a']), False, 1),
+                   (''.join(['version_', 'c']), True, 1)]
+        self.assertIsNot(history[0][0], versions[0])
+        params = HistorySummary(versions, history)
+        self.assertEqual(params.success_counts.tolist(), [0, 0, 1])
+        self.assertEqual(params.failure_counts.tolist(), [1, 0, 0])
+        self.assertEqual(params.version_index,
+                         {'version_a': 0, 'version_b': 1, 'version_c': 2})
+
+    def test_incremental_params(self):
+        """Test that appending a result to a summary matches rebuilding it."""
+        versions = ['a', 'b', 'c']
+        history = [('a', False, 1), ('b', True, 1), ('c', True, 1)]
+        params = HistorySummary(versions, history)
+        for result in [('a', True, 1), ('c', False, 1), ('c', False, 1)]:
+            history.append(result)
+            params.append(result)
+            expected = HistorySummary(versions, history)
+            self.assertEqual(params.count, expected.count)
+            self.assertEqual(params.success_counts.tolist(),
+                             expected.success_counts.tolist())
+            self.assertEqual(params.left_sum_failures.tolist(),
+                             expected.left_sum_failures.tolist())
+            self.assertEqual(params.right_sum_counts.tolist(),
+                             expected.right_sum_counts.tolist())
+            self.assertEqual(p_value(params, Change('b', 'c')),
+                             p_value(expected, Change('b', 'c')))
 
     def test_p_formula_struture(self):
         """Sanity-check that I have something like the correct formula for
@@ -66,6 +122,53 @@ class TestParameterComputation(unittest.TestCase):
             ps = new_ps
             history *= 2
 
+    def test_binomial_test(self):
+        """Check the vectorized binomial test against scipy's."""
+        rng = random.Random(2)
+        for _ in range(20):
+            p = rng.random()
+            trials = [rng.randint(1, 60) for _ in range(5)]
+            successes = [rng.randint(0, n) for n in trials]
+            actual = binomial_test_p_values(successes, trials, p)
+            for k, n, pval in zip(successes, trials, actual):
+                expected = scipy.stats.binomtest(k, n, p).pvalue
+                self.assertAlmostEqual(pval, expected, places=10)
+        # With p at 0 or 1 only one outcome is possible.
+        for p in [0., 1.]:
+            trials = [28, 28, 5]
+            successes = [27, int(28 * p), 0]
+            actual = binomial_test_p_values(successes, trials, p)
+            for k, n, pval in zip(successes, trials, actual):
+                self.assertEqual(pval, scipy.stats.binomtest(k, n, p).pvalue)
+
+    def test_binomial_test_large(self):
+        """Check the binary-search binomial test, used for large trial
+        counts, against scipy's."""
+        rng = random.Random(3)
+        for _ in range(20):
+            p = rng.random()
+            trials = [rng.randint(1, 100000) for _ in range(5)]
+            successes = [min(n, max(0, round(rng.gauss(p * n, 2 * n ** 0.5))))
+                         for n in trials]
+            actual = binomial_test_p_values(successes, trials, p)
+            for k, n, pval in zip(successes, trials, actual):
+                expected = scipy.stats.binomtest(k, n, p).pvalue
+                self.assertAlmostEqual(pval, expected, places=10)
+                if expected > 1e-300:
+                    self.assertAlmostEqual(pval / expected, 1, places=7)
+
+    def test_fisher_combination(self):
+        """Check the closed-form Fisher's method against scipy's."""
+        for p_left, p_right in [(1, 1), (0.5, 0.25), (1e-6, 0.9), (0.3, 0.3)]:
+            _stat, expected = scipy.stats.combine_pvalues([p_left, p_right])
+            self.assertAlmostEqual(
+                fisher_combined_p_value(p_left, p_right), expected, places=12)
+        with np.errstate(all='raise'):
+            self.assertEqual(fisher_combined_p_value(0., 0.5), 0.)
+            self.assertEqual(
+                fisher_combined_p_value(np.array([0., 1.]), 0.).tolist(),
+                [0., 0.])
+
     def test_probabilities(self):
         """Test that version probability computation works as expected."""
         versions = ['a', 'b', 'c']
@@ -86,6 +189,47 @@ class TestParameterComputation(unittest.TestCase):
         history += [('b', True, 1)] * 5  # Lots more history -> more certain.
         self.assertGreater(history_probabilities(versions, history)[0][1], 0.9)
 
+    def test_best_change(self):
+        """Test that the best change matches the full distribution's first
+        maximum."""
+        versions = ['a', 'b', 'c', 'd']
+        history = []
+        for result in [('a', False, 1), ('b', True, 1), ('c', True, 1),
+                       ('d', True, 1), ('c', False, 1), ('a', False, 1)]:
+            params = HistorySummary(versions, history)
+            probabilities = [p for _, p in summary_probabilities(params)]
+            best = max(range(len(probabilities)),
+                       key=lambda i: probabilities[i])
+            self.assertEqual(summary_best_change(params),
+                             (best, probabilities[best]))
+            history.append(result)
+        # An empty history takes the uniform answer without any p-values.
+        empty = HistorySummary(versions, [])
+        self.assertEqual(summary_best_change(empty), (0, 1 / 3))
+        self.assertIsNone(empty._p_values)
+
+    def test_hypothetical_guesses(self):
+        """Test that hypothetical guesses match actually adding a result."""
+        versions = ['a', 'b', 'c', 'd']
+        history = [('a', True, 1), ('a', True, 1), ('b', True, 1),
+                   ('c', False, 1), ('c', True, 1), ('d', False, 1)]
+        params = HistorySummary(versions, history)
+        for success in [True, False]:
+            expected = [
+                Guess(versions, history + [(version, success, 1)]
+                      ).guess_probability
+                for version in versions]
+            actual = params.hypothetical_guess_probabilities(success)
+            for a, e in zip(actual.tolist(), expected):
+                self.assertAlmostEqual(a, e, places=12)
+
+        # Appending a hypothesized outcome reuses its p-values.
+        params.append(('b', False, 1))
+        expected = HistorySummary(versions, history + [('b', False, 1)])
+        for change in params.changes:
+            self.assertAlmostEqual(p_value(params, change),
+                                   p_value(expected, change), places=12)
+
     def test_guessing(self):
         """Actually make a guess on difficult random data."""
         random.seed(1)
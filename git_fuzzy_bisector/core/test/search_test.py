@@ -1,7 +1,10 @@
+from git_fuzzy_bisector.core.history_analysis import HistorySummary
 from git_fuzzy_bisector.core.search_problem import SearchProblem
-from git_fuzzy_bisector.core.search_strategy import StrategyRunner
+from git_fuzzy_bisector.core.search_strategy import (
+    BestChangeSearchStrategy, DefaultSearchStrategy, StrategyRunner)
 
 import unittest
+from unittest import mock
 
 
 class TestSearch(unittest.TestCase):
@@ -25,10 +28,110 @@ class TestSearch(unittest.TestCase):
         self.assertEqual(guess.best_change.before, 'banana')
         self.assertEqual(guess.best_change.after, 'carrot')
         self.assertGreater(guess.guess_probability, 0.9)
+        self.assertEqual(len(guess.history), self.counter)
         # The basic strategy wastes a lot of work, but should still be able
         # to do its job in a few hundred tests.
         self.assertLess(self.counter, 400)
 
+    def test_deterministic(self):
+        tested = []
+        def test_fn(version):
+            tested.append(version)
+            return version < 'carrot'
+        problem = SearchProblem(
+            versions=self.versions, test_fn=test_fn, known_test_cost=1,
+            deterministic=True)
+        guess = StrategyRunner().solve(problem, print_monitor=False)
+        self.assertEqual(guess.best_change.after, 'carrot')
+        self.assertEqual(sorted(tested), sorted(set(tested)))
+        # Only the first result at each version cost a test.
+        self.assertGreater(len(guess.history), len(tested))
+        self.assertEqual(sum(cost for (_, _, cost) in guess.history),
+                         len(tested))
+
+    def test_deterministic_strategy(self):
+        """Switching to a version whose result is known is not charged a
+        setup."""
+        history = [('apple', True, 1), ('banana', False, 1)]
+        for deterministic, expected in [(False, 'banana'), (True, 'apple')]:
+            problem = SearchProblem(
+                versions=self.versions, test_fn=self._test_fn,
+                current_version='banana', deterministic=deterministic)
+            self.assertEqual(
+                BestChangeSearchStrategy().next_version(
+                    history, problem, setup_cost=10, test_cost=1),
+                expected)
+
+    def test_problem(self):
+        problem = SearchProblem(
+            versions=iter(self.versions), test_fn=self._test_fn,
+            current_version='banana')
+        self.assertEqual(problem.versions, tuple(self.versions))
+        self.assertEqual(problem.index_of('carrot'), 2)
+        with self.assertRaises(AssertionError):
+            SearchProblem(versions=self.versions, test_fn=self._test_fn,
+                          current_version='eggplant')
+
+    def test_unknown_setup_cost(self):
+        """A search that starts on one of its versions has not timed a setup
+        before its second choice."""
+        setups = []
+        problem = SearchProblem(
+            versions=self.versions, test_fn=self._test_fn,
+            setup_fn=setups.append, current_version='daikon')
+        guess = StrategyRunner().solve(problem, print_monitor=False)
+        self.assertEqual(guess.best_change.after, 'carrot')
+        self.assertNotEqual(setups[0], 'daikon')
+
+    def test_target_probability(self):
+        problem = SearchProblem(
+            versions=self.versions,
+            test_fn=self._test_fn,
+            known_setup_cost=10,
+            known_test_cost=1,
+            target_probability=0.5)
+        guess = StrategyRunner().solve(problem, print_monitor=False)
+        self.assertGreaterEqual(guess.guess_probability, 0.5)
+        self.assertLess(guess.guess_probability, 0.9)
+
+    def test_default_strategy(self):
+        strategy = DefaultSearchStrategy()
+        problem = SearchProblem(
+            versions=self.versions, test_fn=self._test_fn,
+            current_version='apple')
+        history = [('apple', True, 1), ('apple', False, 1),
+                   ('banana', True, 1)]
+        # Stays on the current version while the imbalance is affordable...
+        self.assertEqual(
+            strategy.next_version(history, problem, setup_cost=3, test_cost=1),
+            'apple')
+        # ...and otherwise moves to the first least-tested version.
+        self.assertEqual(
+            strategy.next_version(history, problem, setup_cost=1, test_cost=1),
+            'carrot')
+        history += [('apple', True, 1)]
+        self.assertEqual(
+            strategy.next_version(history, problem, setup_cost=2, test_cost=1,
+                                  summary=HistorySummary(self.versions,
+                                                         history)),
+            'carrot')
+
+    def test_updated_cost(self):
+        # A known cost (even zero) is used as-is.
+        self.assertEqual(
+            StrategyRunner.updated_cost(0, 5., lambda: 'result'),
+            ('result', 0))
+        # Otherwise durations are smoothed into the running estimate.
+        with mock.patch('time.perf_counter', side_effect=[1., 3.]):
+            self.assertEqual(
+                StrategyRunner.updated_cost(None, None, lambda: 'result'),
+                ('result', 2.))
+        with mock.patch('time.perf_counter', side_effect=[1., 3.]):
+            result, cost = StrategyRunner.updated_cost(
+                None, 12., lambda: 'result')
+        self.assertEqual(result, 'result')
+        self.assertAlmostEqual(cost, 0.2 * 2. + 0.8 * 12.)
+
 
 if __name__ == '__main__':
     unittest.main()
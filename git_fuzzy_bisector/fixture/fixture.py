@@ -6,10 +6,32 @@ import os.path
 import os
 from typing import List
 import random
-import stat
 import subprocess
 import textwrap
 
+# The fixture files are the same for every revision, up to the run script's parameters.
+_GITIGNORE_TEXT = textwrap.dedent("""\
+    /seed.*
+    """)
+
+_RUN_SCRIPT_TEMPLATE = textwrap.dedent("""\
+    #!/usr/bin/env python3
+    import pickle
+    import random
+    import sys
+    rnd = random.Random()
+    if __name__ == "__main__":
+        try:
+            with open("{seedfile}", "rb") as f:
+                rnd.setstate(pickle.load(f))
+        except FileNotFoundError:
+            rnd.seed({uid})
+        succeed = rnd.random() < {probability}
+        with open("{seedfile}", "wb") as f:
+            pickle.dump(rnd.getstate(), f)
+        sys.exit(0 if succeed else 1)
+    """)
+
 def make_fixture(target_dir: str, revision_success_probabilities: List[float], quiet: bool) -> List[str]:
     """Given a directory location @p target_dir, create a git repository at that location which
     contains one revision for each of @p revision_success_probabilities.  Each revision will
@@ -20,79 +42,53 @@ def make_fixture(target_dir: str, revision_success_probabilities: List[float], q
     """
     target_dir = os.path.abspath(target_dir)
     os.makedirs(target_dir)
-    revision_hashes = []
     create_fixture_git_repo(target_dir, quiet)
-    for (index, probability) in enumerate(revision_success_probabilities):
-        revision_hashes.append(create_fixture_revision(target_dir, index, probability, quiet))
+    revision_hashes = import_fixture_revisions(target_dir, revision_success_probabilities)
+    # fast-import writes only objects and refs; check out the last revision.
+    quiet_args = {"stdout": subprocess.DEVNULL} if quiet else {}
+    subprocess.check_call(['git', 'reset', '--hard'], cwd=target_dir, **quiet_args)
+    if not quiet:
+        for (index, (revision, probability)) in enumerate(
+                zip(revision_hashes, revision_success_probabilities)):
+            print("Created revision %d, hash %s, with probability %f" % (index, revision, probability))
     return revision_hashes
 
-def _ensure_gone(target: str):
-    try:
-        os.remove(target)
-    except FileNotFoundError:
-        pass
-
 def create_fixture_git_repo(target_dir: str, quiet:bool):
     """Create a git repo at @p target_dir to contain a test fixture."""
     quiet_args = {"stdout": subprocess.DEVNULL} if quiet else {}
-    subprocess.check_call(['mkdir', '-p', target_dir], **quiet_args)
+    os.makedirs(target_dir, exist_ok=True)
     subprocess.check_call(['git', 'init'], cwd=target_dir, **quiet_args)
 
-def create_fixture_revision(target_dir: str, uid: int, probability: float, quiet: bool):
-    """Given a git repo at @p target_dir, commit a new revision to that repo containing
-    a fixture that succeeds with @p probability, is seeded with @p seed, and that stores
-    its state indexed by the unique number @p uid."""
-    quiet_args = {"stdout": subprocess.DEVNULL} if quiet else {}
-    subprocess.check_call(['git', 'clean', '-f'], cwd=target_dir, **quiet_args)
-
-    gitignore_file = os.path.join(target_dir, ".gitignore")
-    _create_gitignore_file(gitignore_file)
-    subprocess.check_call(['git', 'add', gitignore_file], cwd=target_dir, **quiet_args)
+def import_fixture_revisions(target_dir: str, revision_success_probabilities: List[float]) -> List[bytes]:
+    """Given a git repo with no commits at @p target_dir, commit one fixture revision for each of
+    @p revision_success_probabilities to its current branch.  All revisions are written by a
+    single `git fast-import` run rather than several git processes per revision.  The working
+    tree is not updated.
 
-    seed_file = os.path.join(target_dir, "seed.%d" % uid)
-    run_script = os.path.join(target_dir, "run.py")
-    _create_run_script(run_script, uid, seed_file, probability)
-    subprocess.check_call(['git', 'add', run_script], cwd=target_dir, **quiet_args)
-
-    subprocess.check_call(['git', 'commit', '-m', "revision id %d" % uid], cwd=target_dir, **quiet_args)
-    revision = subprocess.check_output(['git', 'log', "--pretty=%H", '--max-count=1'], cwd=target_dir).rstrip()
-    if not quiet:
-        print("Created revision %d, hash %s, with probability %f" % (uid, revision, probability))
-    return revision
-
-def _create_gitignore_file(target_path: str):
-    _ensure_gone(target_path)
-    with open(target_path, "w") as f:
-        f.write(textwrap.dedent("""\
-            /seed.*
-            """))
-
-def _create_seed_file(target_path: str, seed: int):
-    _ensure_gone(target_path)
-    with open(target_path, "w") as f:
-        f.write("%d\n" % seed)
+    @return a list of revision hashes, in order.
+    """
+    branch = subprocess.check_output(['git', 'symbolic-ref', 'HEAD'], cwd=target_dir).rstrip()
+    committer = subprocess.check_output(['git', 'var', 'GIT_COMMITTER_IDENT'], cwd=target_dir).rstrip()
+    gitignore = _GITIGNORE_TEXT.encode()
+    stream = []
+    for (uid, probability) in enumerate(revision_success_probabilities):
+        seed_file = os.path.join(target_dir, "seed.%d" % uid)
+        run_script = _run_script_text(uid, seed_file, probability).encode()
+        message = b"revision id %d\n" % uid
+        # Each commit on `branch` implicitly takes the previous one as its parent.
+        stream += [b"commit %s\n" % branch,
+                   b"committer %s\n" % committer,
+                   b"data %d\n%s" % (len(message), message),
+                   b"M 100644 inline .gitignore\n",
+                   b"data %d\n%s" % (len(gitignore), gitignore),
+                   b"M 100755 inline run.py\n",
+                   b"data %d\n%s" % (len(run_script), run_script),
+                   b"\n"]
+    subprocess.run(['git', 'fast-import', '--quiet'], input=b"".join(stream), cwd=target_dir, check=True)
+    return subprocess.check_output(['git', 'rev-list', '--reverse', branch], cwd=target_dir).splitlines()
 
-def _create_run_script(target_path: str, uid: int, seed_file: str, probability: float):
-    _ensure_gone(target_path)
-    with open(target_path, "w") as f:
-        f.write(textwrap.dedent("""\
-            #!/usr/bin/env python3
-            import pickle
-            import random
-            import sys
-            rnd = random.Random()
-            if __name__ == "__main__":
-                try:
-                    with open("{seedfile}", "rb") as f:
-                        rnd.setstate(pickle.load(f))
-                except FileNotFoundError:
-                    rnd.seed({uid})
-                succeed = rnd.random() < {probability}
-                with open("{seedfile}", "wb") as f:
-                    pickle.dump(rnd.getstate(), f)
-                sys.exit(0 if succeed else 1)
-            """.format(seedfile=seed_file, uid=uid, probability=probability)))
-    os.chmod(target_path, stat.S_IRWXU)
+def _run_script_text(uid: int, seed_file: str, probability: float) -> str:
+    return _RUN_SCRIPT_TEMPLATE.format(seedfile=seed_file, uid=uid, probability=probability)
 
 
 if __name__ == '__main__':